@@ -1,26 +1,621 @@
 import subprocess
 import sys
 import json
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Tuple, Optional
 import os
+import array
+import asyncio
+import fnmatch
+import hashlib
+import io
+import py_compile
+import re
+import select
+import signal
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 
+# TestResult uses dataclass(slots=True), which is new in Python 3.10
+if sys.version_info < (3, 10):
+    sys.exit('grader.py needs Python 3.10 or newer; this is Python %d.%d'
+             % sys.version_info[:2])
+
+# Source of exec_code(), which runs compiled code as __main__ on one input.
+# The in-process runner (_exec_code below) and the driver scripts are both
+# built from it, so every strategy reports output, exit codes and timeouts
+# the same way.
+_EXEC_CODE_SOURCE = r'''
+import builtins
+import io
+import signal
+import sys
+import threading
+import time
+import types
+
+
+class Timeout(BaseException):
+    """Raised by SIGALRM to abort code that runs past its time limit."""
+
+
+def _on_alarm(signum, frame):
+    raise Timeout()
+
+
+def _join_new_threads(before, deadline):
+    """
+    Wait for the non-daemon threads started since before was taken, as
+    interpreter shutdown would, until deadline (a time.monotonic() value,
+    or None to wait indefinitely).
+    """
+    while True:
+        pending = [thread for thread in threading.enumerate()
+                   if thread not in before and not thread.daemon]
+        if not pending:
+            return
+        if deadline is None:
+            pending[0].join()
+            continue
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        pending[0].join(remaining)
+
+
+class _Buffer(io.BytesIO):
+    """Bytes buffer that stays readable after the code closes its stream."""
+    
+    def close(self):
+        pass
+
+
+def exec_code(code, code_file, input_bytes, timeout=None, stdout=None, stderr=None):
+    """
+    Execute compiled code as __main__ with redirected standard streams.
+    
+    The code runs in a fresh module installed as sys.modules['__main__'] for
+    the duration, so pickling its classes or importing __main__ works.
+    The replacement streams are backed by bytes buffers, so code that uses
+    sys.stdin.buffer or sys.stdout.buffer behaves as it would in a fresh
+    interpreter. If binary files are given as stdout and stderr, the output
+    is written to them as the code runs instead, and returned empty.
+    
+    If a timeout is given, the code is interrupted by SIGALRM once it runs
+    past it (POSIX, main thread only), and again every 0.1 seconds after
+    that. This only stops code that catches the exception if one of the
+    later alarms lands outside its handler; a loop catching everything
+    around a blocking call can run forever, and only killing the process
+    stops it. A run that took longer is reported as timed out in any case. Non-daemon threads the code
+    starts are waited for within the same limit, as interpreter shutdown
+    would wait for them.
+    
+    Returns:
+        Tuple of (stdout, stderr, return_code, timed_out), as a fresh
+        interpreter running code_file would have reported them
+    """
+    saved = sys.argv, sys.stdin, sys.stdout, sys.stderr
+    saved_main = sys.modules.get('__main__')
+    main = types.ModuleType('__main__')
+    main.__file__ = code_file
+    main.__builtins__ = builtins
+    sys.modules['__main__'] = main
+    captured = stdout is None
+    if captured:
+        stdout, stderr = _Buffer(), _Buffer()
+    sys.argv = [code_file]
+    sys.stdin = io.TextIOWrapper(io.BytesIO(input_bytes), encoding='utf-8')
+    sys.stdout = io.TextIOWrapper(stdout, encoding='utf-8', write_through=True)
+    sys.stderr = io.TextIOWrapper(stderr, encoding='utf-8',
+                                  errors='backslashreplace', write_through=True)
+    use_alarm = (timeout is not None and hasattr(signal, 'setitimer')
+                 and threading.current_thread() is threading.main_thread())
+    return_code = 0
+    timed_out = False
+    start = time.monotonic()
+    threads_before = set(threading.enumerate())
+    try:
+        # Disarm inside the outer try, so an alarm that fires just as the
+        # code finishes is still caught below
+        try:
+            if use_alarm:
+                previous_handler = signal.signal(signal.SIGALRM, _on_alarm)
+                signal.setitimer(signal.ITIMER_REAL, timeout, 0.1)
+            try:
+                exec(code, main.__dict__)
+            finally:
+                _join_new_threads(threads_before,
+                                  None if timeout is None else start + timeout)
+        finally:
+            if use_alarm:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+                signal.signal(signal.SIGALRM, previous_handler)
+    except SystemExit as e:
+        if e.code is None:
+            return_code = 0
+        elif isinstance(e.code, int):
+            return_code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            return_code = 1
+    except Timeout:
+        timed_out = True
+    except KeyboardInterrupt:
+        raise
+    except BaseException as e:
+        # Leave this function's frame out of the traceback (the hook prints
+        # the exception's own). The default hook is written in C, so deep
+        # tracebacks (RecursionError) stay cheap.
+        e.__traceback__ = e.__traceback__.tb_next
+        sys.__excepthook__(type(e), e, e.__traceback__)
+        return_code = 1
+    finally:
+        # Restore the streams first, so the caller's own are never left
+        # pointing at the code's (possibly closed) ones
+        sys.argv, sys.stdin, sys.stdout, sys.stderr = saved
+        sys.modules['__main__'] = saved_main
+        output = (stdout.getvalue(), stderr.getvalue()) if captured else (b'', b'')
+    # Also catches code that swallowed the Timeout, or no SIGALRM
+    if timeout is not None and time.monotonic() - start > timeout:
+        timed_out = True
+    return (*output, return_code, timed_out)
+'''
+
+# Start of every script run in a child interpreter; code_file must be set.
+_CHILD_SETUP = r'''
+import builtins, os, sys
+# Isolated mode (-I) leaves the script directory off sys.path; add it back
+sys.path[:0 if sys.flags.isolated else 1] = [
+    os.path.dirname(os.path.abspath(code_file))]
+# Without site (-S) the exit()/quit() helpers are missing
+if not hasattr(builtins, 'exit'):
+    builtins.exit = builtins.quit = sys.exit
+'''
+
+# Shared start of the scripts that run several test cases in one interpreter.
+# It compiles the code file (argv[1]) once and defines run(data), which execs
+# it on one input under the per-case time limit (argv[2], in seconds) and
+# returns (stdout, stderr, return_code, timed_out), or None if the code wrote
+# to file descriptor 1 directly. Such a case is only reported faithfully by a
+# fresh interpreter, so the driver stops there and leaves it to the fallback.
+#
+# The driver talks to the grader through copies of fds 0 and 1 (channel_in
+# and channel_out). At the descriptor level the code sees a file holding its
+# input as fd 0 and a scratch file as fd 1, both dup'ed afresh for each case
+# (so one the previous case closed does not carry over), and nothing it does
+# there can corrupt the records.
+_DRIVER_PRELUDE = r'''
+import sys
+code_file, timeout = sys.argv[1], float(sys.argv[2])
+''' + _CHILD_SETUP + _EXEC_CODE_SOURCE + r'''
+import tempfile
+with open(code_file) as f:
+    code = compile(f.read(), code_file, 'exec')
+
+channel_in = open(os.dup(0), 'rb')
+channel_out = open(os.dup(1), 'wb')
+stdin_file = tempfile.TemporaryFile(buffering=0)
+scratch = tempfile.TemporaryFile()
+
+
+def run(data):
+    stdin_file.seek(0)
+    stdin_file.truncate()
+    stdin_file.write(data)
+    stdin_file.seek(0)
+    os.dup2(stdin_file.fileno(), 0)
+    os.dup2(scratch.fileno(), 1)
+    result = exec_code(code, code_file, data, timeout)
+    if os.fstat(scratch.fileno()).st_size:
+        return None
+    return result
+'''
+
+# Driver used when several test cases share one interpreter (batch_size > 1).
+# It reads length-prefixed inputs from stdin and writes one record per test
+# case to stdout in the format read by _parse_records, with leading fields
+# "timed_out return_code".
+_BATCH_DRIVER = _DRIVER_PRELUDE + r'''
+while True:
+    header = channel_in.readline()
+    if not header:
+        break
+    result = run(channel_in.read(int(header)))
+    if result is None:
+        break
+    stdout, stderr, return_code, timed_out = result
+    channel_out.write(b'%d %d %d %d\n' % (timed_out, return_code,
+                                          len(stdout), len(stderr)))
+    channel_out.write(stdout)
+    channel_out.write(stderr)
+    channel_out.flush()
+# Threads a timed-out case left running must not hold the interpreter open
+os._exit(0)
+'''
+
+# Main loop of the per-suite script generated by _run_suite, which puts a
+# CASES tuple of (input, stripped expected output) bytes pairs in front of it.
+# Each record has leading fields "passed timed_out return_code", and the
+# stdout of a passing case is left out. Records are flushed one at a time so
+# the parent keeps those written before the interpreter died.
+_SUITE_DRIVER_LOOP = r'''
+for data, expected in CASES:
+    result = run(data)
+    if result is None:
+        break
+    stdout, stderr, return_code, timed_out = result
+    passed = not timed_out and stdout.strip() == expected
+    if passed:
+        stdout = b''
+    channel_out.write(b'%d %d %d %d %d\n' % (passed, timed_out, return_code,
+                                             len(stdout), len(stderr)))
+    channel_out.write(stdout)
+    channel_out.write(stderr)
+    channel_out.flush()
+os._exit(0)
+'''
+
+
+# Bootstrap passed to "python -c" to run a code file from its compiled .pyc,
+# skipping the compile step a plain "python code_file" repeats on every run.
+# argv: code_file pyc_file
+_PYC_BOOTSTRAP = r'''
+import marshal, sys, types
+code_file, pyc_file = sys.argv[1:]
+sys.argv = [code_file]
+''' + _CHILD_SETUP + r'''
+with open(pyc_file, 'rb') as f:
+    code = marshal.loads(f.read()[16:])
+# Run the code in a module of its own, installed as __main__ (which this
+# script's module is), so pickling its classes or importing __main__ works
+main = types.ModuleType('__main__')
+main.__file__ = code_file
+main.__builtins__ = builtins
+sys.modules['__main__'] = main
+del marshal, os, f, pyc_file
+try:
+    exec(code, main.__dict__)
+except SystemExit:
+    raise
+except BaseException as e:
+    # Report it as "python code_file" would, without this script's frame
+    e.__traceback__ = e.__traceback__.tb_next
+    sys.__excepthook__(type(e), e, e.__traceback__)
+    sys.exit(1)
+'''
+
+
+def _parse_records(data: bytes, fields: int, partial: bool = False) -> List[Tuple]:
+    """
+    Parse the records written by the driver scripts.
+    
+    Each record is a header line of integers ending in "stdout_length
+    stderr_length", followed by the raw stdout and stderr bytes. The leading
+    integers are "timed_out return_code" for _BATCH_DRIVER, or "passed
+    timed_out return_code" for _SUITE_DRIVER_LOOP.
+    
+    Args:
+        data: Concatenated records
+        fields: Number of leading integers each header must have
+        partial: Return the complete records at the start of data instead of
+                 raising if it ends in the middle of a record (e.g. output
+                 of a process that was killed)
+        
+    Returns:
+        List of (stdout, stderr, *leading integers) tuples, e.g.
+        (stdout, stderr, timed_out, return_code)
+        
+    Raises:
+        ValueError: If the data is truncated (unless partial is set) or
+                    malformed, e.g. a header with the wrong number of fields
+    """
+    records = []
+    pos = 0
+    while pos < len(data):
+        end = data.find(b'\n', pos)
+        if end == -1:
+            if partial:
+                break
+            raise ValueError('Truncated record header')
+        *leading, out_len, err_len = map(int, data[pos:end].split())
+        if len(leading) != fields:
+            raise ValueError('Malformed record header')
+        out_start = end + 1
+        err_start = out_start + out_len
+        pos = err_start + err_len
+        if pos > len(data):
+            if partial:
+                break
+            raise ValueError('Truncated record')
+        records.append((data[out_start:err_start], data[err_start:pos], *leading))
+    return records
+
+
+# Bytes removed by bytes.strip()
+_WHITESPACE = frozenset(b' \t\n\r\x0b\x0c')
+
+
+def _strip_view(data: bytes) -> memoryview:
+    """Return data without surrounding ASCII whitespace, without copying it."""
+    start, end = 0, len(data)
+    while end > start and data[end - 1] in _WHITESPACE:
+        end -= 1
+    while start < end and data[start] in _WHITESPACE:
+        start += 1
+    return memoryview(data)[start:end]
+
+
+def _outputs_match(output: bytes, expected: bytes) -> bool:
+    """
+    Check whether output equals expected, ignoring surrounding ASCII
+    whitespace in output.
+    
+    This runs once per test, so in the common case (no leading whitespace)
+    the scanning and comparing is left to bytes methods instead of a Python
+    loop over the output.
+    
+    Args:
+        output: Raw program output
+        expected: Expected output, already stripped
+        
+    Returns:
+        True if the outputs match
+    """
+    size = len(expected)
+    if len(output) < size:
+        return False
+    if size and output[:1].isspace():
+        with _strip_view(output) as actual:
+            return len(actual) == size and actual == expected
+    if not output.startswith(expected):
+        return False
+    tail = output[size:]
+    return not tail or tail.isspace()
+
+
+def _preview(text: Optional[str], limit: int = 256) -> str:
+    """Return repr(text), truncated after limit characters for large values."""
+    if text is None or len(text) <= limit:
+        return repr(text)
+    return f"{text[:limit]!r}... ({len(text)} characters)"
+
+
+def _decode_output(data: bytes) -> str:
+    """Decode captured output the way subprocess text mode does."""
+    return data.decode('utf-8', errors='replace').replace('\r\n', '\n').replace('\r', '\n')
+
+
+def _event_loop_running() -> bool:
+    """Whether this thread is inside a running asyncio event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+# The in-process runner uses the same exec_code() the driver scripts embed
+_exec_namespace = {}
+exec(compile(_EXEC_CODE_SOURCE, '<exec_code>', 'exec'), _exec_namespace)
+_exec_code = _exec_namespace['exec_code']
+
+
+class _ForkWorker:
+    """
+    Run a code file in forked children of the grader process.
+    
+    The code file is compiled once up front; each test case then costs a
+    fork() instead of a full interpreter start-up. POSIX only.
+    """
+    
+    def __init__(self, code_file: str):
+        """
+        Compile the code file.
+        
+        Args:
+            code_file: Path to the Python file to test
+            
+        Raises:
+            OSError: If the code file cannot be read
+            SyntaxError: If the code file does not compile
+        """
+        self.code_file = code_file
+        with open(code_file) as f:
+            self._code = compile(f.read(), code_file, 'exec')
+    
+    def run(self, input_bytes: bytes, timeout: float) -> Tuple[bytes, bytes, int]:
+        """
+        Run the compiled code in a forked child.
+        
+        The child gets its own file descriptors 0-2 (the input and two
+        temporary files), as a fresh interpreter would, so code that uses
+        them directly never touches the grader's streams, and output written
+        before os._exit() is kept. It reports the return code through its
+        exit status.
+        
+        Args:
+            input_bytes: UTF-8 encoded input to pass to the program (via stdin)
+            timeout: Maximum execution time in seconds
+            
+        Returns:
+            Tuple of (stdout, stderr, return_code)
+            
+        Raises:
+            subprocess.TimeoutExpired: If the child runs past the timeout
+        """
+        with tempfile.TemporaryFile() as stdin_file, \
+                tempfile.TemporaryFile() as stdout_file, \
+                tempfile.TemporaryFile() as stderr_file:
+            stdin_file.write(input_bytes)
+            stdin_file.seek(0)
+            # The child never writes to the pipe; it reaches EOF when the
+            # child exits
+            read_fd, write_fd = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                exit_code = 1
+                try:
+                    os.close(read_fd)
+                    for fd, file in enumerate((stdin_file, stdout_file, stderr_file)):
+                        os.dup2(file.fileno(), fd)
+                    sys.path[0] = os.path.dirname(os.path.abspath(self.code_file))
+                    _, _, return_code, _ = _exec_code(
+                        self._code, self.code_file, input_bytes,
+                        stdout=io.FileIO(1, 'w', closefd=False),
+                        stderr=io.FileIO(2, 'w', closefd=False))
+                    # The status a fresh interpreter would exit with
+                    exit_code = return_code & 0xFF
+                finally:
+                    os._exit(exit_code)
+            
+            os.close(write_fd)
+            try:
+                ready, _, _ = select.select([read_fd], [], [], timeout)
+            finally:
+                os.close(read_fd)
+            if not ready:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+                raise subprocess.TimeoutExpired(self.code_file, timeout)
+            
+            _, status = os.waitpid(pid, 0)
+            stdout_file.seek(0)
+            stderr_file.seek(0)
+            return (stdout_file.read(), stderr_file.read(),
+                    os.waitstatus_to_exitcode(status))
+
+
+@dataclass(slots=True)
+class TestResult:
+    """Outcome of running one test case."""
+    test_name: str
+    passed: bool
+    input: str
+    expected_output: str
+    actual_output: Optional[str]
+    stderr: Optional[str] = None
+    return_code: Optional[int] = None
+    error: Optional[str] = None
+
+
 class TestCaseGrader:
-    def __init__(self, code_file: str, timeout: int = 5):
+    def __init__(self, code_file: str, timeout: int = 5, max_workers: int = None,
+                 batch_size: int = 1, use_fork: bool = False,
+                 in_process: bool = False, use_asyncio: bool = False,
+                 memoize: bool = True, fast_startup: bool = False,
+                 fast_pass: bool = True, suite_driver: bool = False):
         """
         Initialize the grader with a Python code file.
         
+        When several execution strategies are enabled, the first that applies
+        wins: in_process, then use_fork, then suite_driver, then batch_size >
+        1, then use_asyncio, and finally a thread pool starting one
+        subprocess per test case.
+        
         Args:
             code_file: Path to the Python file to test
             timeout: Maximum execution time per test case in seconds
+            max_workers: Number of test cases to run concurrently
+                         (default: number of CPUs)
+            batch_size: Number of test cases to run inside one interpreter
+                        (default: 1, a fresh interpreter per test case)
+            use_fork: Fork each test case from this process instead of
+                      starting a new interpreter (POSIX only; ignored elsewhere)
+            in_process: Exec the code inside this interpreter. Fastest, but
+                        the code shares this process's modules, state and
+                        file descriptors (it can read, and close, the
+                        grader's own fd 0), a crash takes the grader down
+                        with it, and timeouts are only enforced on POSIX
+                        from the main thread. Code that catches every
+                        exception can still ignore the timeout and hang the
+                        grader, and threads it leaves running are never
+                        stopped
+            use_asyncio: Drive the subprocesses from one asyncio event loop
+                         instead of a thread pool. Ignored when batch_size >
+                         1, and when tests are run from inside a running
+                         event loop (the thread pool is used instead)
+            memoize: Run the program only once per distinct input and reuse
+                     its output for repeated inputs (assumes the program is
+                     deterministic)
+            fast_startup: Start child interpreters with -I -S and a minimal
+                          environment. This skips user site and site-packages,
+                          so code importing third-party packages fails in
+                          subprocesses (use_fork and in_process still see
+                          them); such failures carry a hint in their error
+            fast_pass: Discard a subprocess's stderr on the first run and
+                       only re-run it with stderr captured if the program
+                       exited with a non-zero status (a wrong answer from a
+                       clean exit is reported without stderr)
+            suite_driver: Run all test cases in one interpreter from a script
+                          generated for the suite, which embeds every input
+                          and expected output (test cases after one that
+                          crashes the interpreter fall back to the other
+                          strategies)
         """
         self.code_file = code_file
         self.timeout = timeout
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.batch_size = max(1, batch_size)
+        self.use_asyncio = use_asyncio
+        self.memoize = memoize
+        self.fast_pass = fast_pass
+        self.suite_driver = suite_driver
         self.results = []
+        # One flag per entry of self.results (1 for passed), kept so the
+        # pass count is a single C-level array.count() call
+        self._passed = array.array('b')
+        
+        # Maps _cache_key(input) to the (stdout, stderr, return_code) of a
+        # completed run on that input; stderr is None if it was not captured
+        self._output_cache: Dict[bytes, Tuple[bytes, bytes, int]] = {}
+        
+        # If the code cannot be compiled here, fall back to subprocesses so
+        # the error is reported through stderr like any other failure.
+        self._code = None
+        if in_process:
+            try:
+                with open(code_file) as f:
+                    self._code = compile(f.read(), code_file, 'exec')
+            except (OSError, SyntaxError, ValueError):
+                pass
+            else:
+                code_dir = os.path.dirname(os.path.abspath(code_file))
+                if code_dir not in sys.path:
+                    sys.path.insert(0, code_dir)
+        
+        self._fork_worker = None
+        if use_fork and not self._code and hasattr(os, 'fork'):
+            try:
+                self._fork_worker = _ForkWorker(code_file)
+            except (OSError, SyntaxError, ValueError):
+                pass
+        
+        # Isolated mode without site skips reading PYTHON* variables, the
+        # user site directory and the site-packages scan at start-up
+        self._python = [sys.executable]
+        self._env = None
+        self._skips_site = fast_startup and not (self._code or self._fork_worker)
+        if fast_startup:
+            self._python += ['-I', '-S']
+            self._env = {name: os.environ[name] for name in ('PATH', 'SYSTEMROOT')
+                         if name in os.environ}
+        
+        # Subprocesses load the code from a .pyc compiled once here. If it
+        # does not compile, run the source so the child reports the error.
+        self._command = [*self._python, code_file]
+        if not self._code and not self._fork_worker:
+            try:
+                pyc_file = py_compile.compile(code_file, doraise=True,
+                                              dfile=os.path.abspath(code_file))
+            except (py_compile.PyCompileError, OSError):
+                pass
+            else:
+                self._command = [*self._python, '-c', _PYC_BOOTSTRAP,
+                                 code_file, pyc_file]
         
     def run_test_case(self, input_data: str, expected_output: str, 
-                      test_name: str = None) -> Dict[str, Any]:
+                      test_name: str = None) -> TestResult:
         """
         Run a single test case.
         
@@ -30,81 +625,541 @@ class TestCaseGrader:
             test_name: Optional name for the test case
             
         Returns:
-            Dictionary containing test results
+            TestResult for the test case
+        """
+        test_result = self._execute_test_case(
+            input_data, expected_output,
+            test_name or f'Test {len(self.results) + 1}'
+        )
+        self.results.append(test_result)
+        self._passed.append(test_result.passed)
+        return test_result
+    
+    def _execute_test_case(self, input_data: str, expected_output: str,
+                           test_name: str, expected_bytes: bytes = None) -> TestResult:
+        """
+        Run a single test case without recording it in self.results.
+        
+        This is safe to call from several threads at once.
+        
+        Args:
+            input_data: Input to pass to the program (via stdin)
+            expected_output: Expected output from the program
+            test_name: Name for the test case
+            expected_bytes: Stripped, UTF-8 encoded expected output, if
+                            already known
+            
+        Returns:
+            TestResult for the test case
         """
         try:
-            # Run the Python file with the input
+            # Input and output stay as bytes so a passing test never goes
+            # through the codec layer.
+            input_bytes = input_data.encode('utf-8')
+            output = self._run_program(input_bytes, capture_stderr=not self.fast_pass)
+            if self._needs_stderr(output):
+                output = self._run_program(input_bytes, capture_stderr=True)
+            return self._build_result(test_name, input_data, expected_output,
+                                      *output, expected_bytes)
+            
+        except subprocess.TimeoutExpired:
+            return self._timeout_result(test_name, input_data, expected_output)
+            
+        except Exception as e:
+            return self._error_result(test_name, input_data, expected_output, str(e))
+    
+    def _run_program(self, input_bytes: bytes,
+                     capture_stderr: bool = True) -> Tuple[bytes, Optional[bytes], int]:
+        """
+        Run the program on one input, reusing the output of an earlier run
+        on the same input when memoization is enabled.
+        
+        Args:
+            input_bytes: UTF-8 encoded input to pass to the program (via stdin)
+            capture_stderr: Whether a subprocess's stderr is needed; if not, it
+                            is sent to DEVNULL instead of a pipe
+            
+        Returns:
+            Tuple of (stdout, stderr, return_code); stderr is None if it was
+            not captured
+            
+        Raises:
+            subprocess.TimeoutExpired: If the program runs past the timeout
+        """
+        key = self._cache_key(input_bytes)
+        output = self._lookup(key, capture_stderr)
+        if output:
+            return output
+        
+        if self._code:
+            output = self._run_in_process(input_bytes)
+        elif self._fork_worker:
+            output = self._fork_worker.run(input_bytes, self.timeout)
+        else:
+            # Run the Python file with the input. Every descriptor Python
+            # opens is non-inheritable (PEP 446), so there is nothing to close
+            # in the child; close_fds=False skips the per-spawn sweep over the
+            # descriptor table and lets subprocess use posix_spawn.
             result = subprocess.run(
-                [sys.executable, self.code_file],
-                input=input_data,
-                capture_output=True,
-                text=True,
-                timeout=self.timeout
+                self._command,
+                input=input_bytes,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE if capture_stderr else subprocess.DEVNULL,
+                timeout=self.timeout,
+                env=self._env,
+                close_fds=False
             )
+            output = result.stdout, result.stderr, result.returncode
+        
+        self._remember(key, output)
+        return output
+    
+    def _cache_key(self, input_bytes: bytes) -> bytes:
+        """Return the _output_cache key for an input, or None if memoization is off."""
+        if not self.memoize:
+            return None
+        return hashlib.blake2b(input_bytes, digest_size=16).digest()
+    
+    def _lookup(self, key: bytes,
+                capture_stderr: bool) -> Optional[Tuple[bytes, Optional[bytes], int]]:
+        """
+        Return the cached output for a key from _cache_key, or None if there
+        is none or it lacks the stderr the caller needs.
+        """
+        output = self._output_cache.get(key)
+        if output is None or (capture_stderr and output[1] is None):
+            return None
+        return output
+    
+    def _needs_stderr(self, output: Tuple[bytes, Optional[bytes], int]) -> bool:
+        """Whether a run without stderr should be repeated to diagnose a crash."""
+        return output[1] is None and output[2] != 0
+    
+    def _remember(self, key: bytes, output: Tuple[bytes, Optional[bytes], int]):
+        """Store the output of a completed run under a key from _cache_key."""
+        if key is not None:
+            self._output_cache[key] = output
+    
+    def _run_in_process(self, input_bytes: bytes) -> Tuple[bytes, bytes, int]:
+        """
+        Exec the precompiled code in this interpreter.
+        
+        Args:
+            input_bytes: UTF-8 encoded input to pass to the program (via stdin)
             
-            actual_output = result.stdout.strip()
-            expected_output = expected_output.strip()
+        Returns:
+            Tuple of (stdout, stderr, return_code)
             
+        Raises:
+            subprocess.TimeoutExpired: If the code runs past the timeout
+        """
+        stdout, stderr, return_code, timed_out = _exec_code(
+            self._code, self.code_file, input_bytes, self.timeout)
+        if timed_out:
+            raise subprocess.TimeoutExpired(self.code_file, self.timeout)
+        return stdout, stderr, return_code
+    
+    def _build_result(self, test_name: str, input_data: str, expected_output: str,
+                      stdout: bytes, stderr: Optional[bytes], return_code: int,
+                      expected_bytes: bytes = None) -> TestResult:
+        """
+        Build the result for a program that ran to completion.
+        
+        The raw output is compared against the encoded expected output first
+        and only decoded when they differ (e.g. output with \\r\\n line
+        endings, which text mode would have translated). The comparison works
+        on the raw stdout, so large outputs are never copied to strip them,
+        and outputs of the wrong length are rejected without a scan.
+        """
+        expected_output = expected_output.strip()
+        if expected_bytes is None:
+            expected_bytes = expected_output.encode('utf-8')
+        
+        if _outputs_match(stdout, expected_bytes):
+            passed = True
+            actual_output = expected_output
+        else:
+            actual_output = _decode_output(stdout).strip()
             passed = actual_output == expected_output
+        
+        error = None
+        if not passed and self._skips_site and stderr and b'ModuleNotFoundError' in stderr:
+            error = ('Hint: fast_startup=True skips site-packages; grade with '
+                     'fast_startup=False if the code imports third-party packages')
+        
+        return TestResult(
+            test_name=test_name,
+            passed=passed,
+            input=input_data,
+            expected_output=expected_output,
+            actual_output=actual_output,
+            stderr=_decode_output(stderr) if stderr else None,
+            return_code=return_code,
+            error=error
+        )
+    
+    def _error_result(self, test_name: str, input_data: str, expected_output: str,
+                      error: str) -> TestResult:
+        """Build the result for a program that could not finish."""
+        return TestResult(
+            test_name=test_name,
+            passed=False,
+            input=input_data,
+            expected_output=expected_output,
+            actual_output=None,
+            error=error
+        )
+    
+    def _timeout_result(self, test_name: str, input_data: str,
+                        expected_output: str) -> TestResult:
+        """Build the result for a program that ran past the timeout."""
+        return self._error_result(test_name, input_data, expected_output,
+                                  f'Timeout: Execution exceeded {self.timeout} seconds')
+    
+    def _run_batch(self, driver_file: str,
+                   batch: List[Tuple[str, str, str, bytes]]) -> List[TestResult]:
+        """
+        Run several test cases inside a single interpreter.
+        
+        The driver enforces the timeout on each test case. If the batch as a
+        whole still runs too long (code stuck where the alarm cannot interrupt
+        it) or it does not report on every test case (for example because
+        the program crashed the interpreter, or wrote to file descriptor 1
+        directly), every test case in the batch is re-run on its own so the
+        outcome is reported against the right test.
+        
+        Args:
+            driver_file: Path to a file containing _BATCH_DRIVER
+            batch: List of (test_name, input_data, expected_output,
+                   expected_bytes) tuples
             
-            test_result = {
-                'test_name': test_name or f'Test {len(self.results) + 1}',
-                'passed': passed,
-                'input': input_data,
-                'expected_output': expected_output,
-                'actual_output': actual_output,
-                'stderr': result.stderr if result.stderr else None,
-                'return_code': result.returncode
-            }
+        Returns:
+            List of test results, in the same order as batch
+        """
+        stream = bytearray()
+        keys = []
+        for _, input_data, _, _ in batch:
+            data = input_data.encode('utf-8')
+            keys.append(self._cache_key(data))
+            stream += b'%d\n' % len(data)
+            stream += data
+        
+        try:
+            result = subprocess.run(
+                [*self._python, driver_file, self.code_file, str(self.timeout)],
+                input=bytes(stream),
+                capture_output=True,
+                # Allow for the interpreter start-up on top of the cases
+                timeout=self.timeout * (len(batch) + 1),
+                env=self._env,
+                close_fds=False
+            )
+            records = _parse_records(result.stdout, 2)
+        except (subprocess.TimeoutExpired, ValueError):
+            records = []
+        
+        if len(records) != len(batch):
+            return [self._execute_test_case(input_data, expected_output, test_name,
+                                            expected_bytes)
+                    for test_name, input_data, expected_output, expected_bytes in batch]
+        
+        results = []
+        for key, (test_name, input_data, expected_output, expected_bytes), \
+                (stdout, stderr, timed_out, return_code) in zip(keys, batch, records):
+            if timed_out:
+                results.append(self._timeout_result(test_name, input_data,
+                                                    expected_output))
+                continue
+            self._remember(key, (stdout, stderr, return_code))
+            results.append(self._build_result(test_name, input_data, expected_output,
+                                              stdout, stderr, return_code,
+                                              expected_bytes))
+        return results
+    
+    def _run_suite(self, cases: List[Tuple[str, str, str, bytes]]) -> List[TestResult]:
+        """
+        Run the test cases in one interpreter from a generated script.
+        
+        The script embeds all inputs and expected outputs, so the suite costs
+        a single interpreter start-up, and only the output of failing cases
+        is sent back. The script enforces the timeout on each test case.
+        
+        If the interpreter dies part-way (e.g. the program called os._exit()
+        or crashed it) or the program writes to file descriptor 1 directly,
+        only the test cases reported before that are returned. If the suite
+        as a whole runs too long (code stuck where the alarm cannot interrupt
+        it), the first unreported test case is reported as a timeout as well.
+        
+        Args:
+            cases: List of (test_name, input_data, expected_output,
+                   expected_bytes) tuples
             
-            self.results.append(test_result)
-            return test_result
+        Returns:
+            List of test results for a prefix of cases, in the same order;
+            the caller should run the remaining cases another way
+        """
+        embedded = []
+        for _, input_data, expected_output, expected_bytes in cases:
+            if expected_bytes is None:
+                expected_bytes = expected_output.strip().encode('utf-8')
+            embedded.append((input_data.encode('utf-8'), expected_bytes))
+        
+        timed_out = False
+        fd, driver_file = tempfile.mkstemp(prefix='runner_generated_', suffix='.py')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(_DRIVER_PRELUDE)
+                f.write(f'CASES = {tuple(embedded)!r}\n')
+                f.write(_SUITE_DRIVER_LOOP)
+            try:
+                output = subprocess.run(
+                    [*self._python, driver_file, self.code_file, str(self.timeout)],
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    # Allow for the interpreter start-up on top of the cases
+                    timeout=self.timeout * (len(cases) + 1),
+                    env=self._env,
+                    close_fds=False
+                ).stdout
+            except subprocess.TimeoutExpired as e:
+                output = e.stdout or b''
+                timed_out = True
+        finally:
+            os.remove(driver_file)
+        
+        try:
+            records = _parse_records(output, 3, partial=True)
+        except ValueError:
+            records = []
+        
+        results = []
+        for (test_name, input_data, expected_output, expected_bytes), \
+                (input_bytes, expected), (stdout, stderr, passed, case_timed_out, return_code) \
+                in zip(cases, embedded, records):
+            if case_timed_out:
+                results.append(self._timeout_result(test_name, input_data,
+                                                    expected_output))
+                continue
+            if passed:
+                # Left out by the script because it matched
+                stdout = expected
+            self._remember(self._cache_key(input_bytes), (stdout, stderr, return_code))
+            results.append(self._build_result(test_name, input_data, expected_output,
+                                              stdout, stderr, return_code,
+                                              expected_bytes))
+        
+        if timed_out and len(results) < len(cases):
+            test_name, input_data, expected_output, _ = cases[len(results)]
+            results.append(self._timeout_result(test_name, input_data,
+                                                expected_output))
+        return results
+    
+    async def _run_test_async(self, semaphore: asyncio.Semaphore, test_name: str,
+                              input_data: str, expected_output: str,
+                              expected_bytes: bytes = None) -> TestResult:
+        """
+        Run a single test case in a subprocess managed by the event loop.
+        
+        Args:
+            semaphore: Bounds the number of subprocesses alive at once
+            test_name: Name for the test case
+            input_data: Input to pass to the program (via stdin)
+            expected_output: Expected output from the program
+            expected_bytes: Stripped, UTF-8 encoded expected output, if
+                            already known
+            
+        Returns:
+            TestResult for the test case
+        """
+        input_bytes = input_data.encode('utf-8')
+        key = self._cache_key(input_bytes)
+        
+        async def run(capture_stderr):
+            output = self._lookup(key, capture_stderr)
+            if not output:
+                async with semaphore:
+                    output = await self._spawn_async(input_bytes, capture_stderr)
+                self._remember(key, output)
+            return output
+        
+        try:
+            output = await run(capture_stderr=not self.fast_pass)
+            if self._needs_stderr(output):
+                output = await run(capture_stderr=True)
+            return self._build_result(test_name, input_data, expected_output,
+                                      *output, expected_bytes)
             
         except subprocess.TimeoutExpired:
-            test_result = {
-                'test_name': test_name or f'Test {len(self.results) + 1}',
-                'passed': False,
-                'input': input_data,
-                'expected_output': expected_output,
-                'actual_output': None,
-                'error': f'Timeout: Execution exceeded {self.timeout} seconds',
-                'return_code': None
-            }
-            self.results.append(test_result)
-            return test_result
+            return self._timeout_result(test_name, input_data, expected_output)
             
         except Exception as e:
-            test_result = {
-                'test_name': test_name or f'Test {len(self.results) + 1}',
-                'passed': False,
-                'input': input_data,
-                'expected_output': expected_output,
-                'actual_output': None,
-                'error': str(e),
-                'return_code': None
-            }
-            self.results.append(test_result)
-            return test_result
-    
-    def run_multiple_tests(self, test_cases: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+            return self._error_result(test_name, input_data, expected_output, str(e))
+    
+    async def _spawn_async(self, input_bytes: bytes,
+                           capture_stderr: bool) -> Tuple[bytes, Optional[bytes], int]:
+        """
+        Run the program once in a subprocess managed by the event loop.
+        
+        Args:
+            input_bytes: UTF-8 encoded input to pass to the program (via stdin)
+            capture_stderr: Whether to pipe stderr back or send it to DEVNULL
+            
+        Returns:
+            Tuple of (stdout, stderr, return_code); stderr is None if it was
+            not captured
+            
+        Raises:
+            subprocess.TimeoutExpired: If the program runs past the timeout
+        """
+        proc = await asyncio.create_subprocess_exec(
+            *self._command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=(asyncio.subprocess.PIPE if capture_stderr
+                    else asyncio.subprocess.DEVNULL),
+            env=self._env,
+            close_fds=False
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                proc.communicate(input_bytes),
+                timeout=self.timeout
+            )
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise subprocess.TimeoutExpired(self.code_file, self.timeout)
+        return stdout, stderr, proc.returncode
+    
+    async def _run_all_async(self, cases: List[Tuple[str, str, str, bytes]]) -> List[TestResult]:
+        """Run (test_name, input_data, expected_output, expected_bytes) cases concurrently."""
+        semaphore = asyncio.Semaphore(self.max_workers)
+        return await asyncio.gather(*(
+            self._run_test_async(semaphore, *case) for case in cases
+        ))
+    
+    def run_multiple_tests(self, test_cases: List[Dict[str, str]]) -> List[TestResult]:
         """
         Run multiple test cases.
         
         Args:
-            test_cases: List of dictionaries with 'input', 'expected_output', and optional 'name'
+            test_cases: List of dictionaries with 'input', 'expected_output', and optional
+                        'name' and 'expected_bytes' (the stripped, UTF-8 encoded
+                        expected output)
             
         Returns:
             List of test results
         """
         self.results = []
-        for test_case in test_cases:
-            self.run_test_case(
-                input_data=test_case.get('input', ''),
-                expected_output=test_case.get('expected_output', ''),
-                test_name=test_case.get('name')
-            )
+        self._passed = array.array('b')
+        cases = [(test_case.get('name') or f'Test {index + 1}',
+                  test_case.get('input', ''),
+                  test_case.get('expected_output', ''),
+                  test_case.get('expected_bytes'))
+                 for index, test_case in enumerate(test_cases)]
+        
+        # Run each distinct input once. Repeats are filled in afterwards from
+        # the output cache without starting the program again.
+        pending = list(range(len(cases)))
+        # Maps the index of a repeated input to the index of its first run
+        first_runs = {}
+        if self.memoize:
+            first_by_key = {}
+            pending = []
+            for index, (_, input_data, _, _) in enumerate(cases):
+                key = self._cache_key(input_data.encode('utf-8'))
+                if key in first_by_key:
+                    first_runs[index] = first_by_key[key]
+                elif key not in self._output_cache:
+                    first_by_key[key] = index
+                    pending.append(index)
+        
+        results = [None] * len(cases)
+        for index, result in zip(pending, self._run_cases([cases[i] for i in pending])):
+            results[index] = result
+        
+        # Timeouts and errors leave nothing in the output cache; reuse the
+        # first run's error rather than running the program again. A run
+        # that completed can still carry an error (a hint), so look at
+        # whether it produced output.
+        for index, first in first_runs.items():
+            if results[first].actual_output is None:
+                test_name, input_data, expected_output, _ = cases[index]
+                results[index] = self._error_result(test_name, input_data,
+                                                    expected_output,
+                                                    results[first].error)
+        
+        self.results = [
+            result or self._execute_test_case(input_data, expected_output, test_name,
+                                              expected_bytes)
+            for result, (test_name, input_data, expected_output, expected_bytes)
+            in zip(results, cases)
+        ]
+        self._passed = array.array('b', (r.passed for r in self.results))
         return self.results
     
+    def _run_cases(self, cases: List[Tuple[str, str, str, bytes]]) -> List[TestResult]:
+        """
+        Run (test_name, input_data, expected_output, expected_bytes) cases
+        using the configured execution strategy.
+        
+        Returns:
+            List of test results, in the same order as cases
+        """
+        # In-process runs redirect this process's standard streams, and forking
+        # from a multi-threaded process is unsafe, so both run one test case at
+        # a time from this thread.
+        if self._code or self._fork_worker:
+            return [self._execute_test_case(input_data, expected_output, test_name,
+                                            expected_bytes)
+                    for test_name, input_data, expected_output, expected_bytes in cases]
+        
+        if self.suite_driver and cases:
+            # Test cases the suite script did not report on (from one that
+            # crashed its interpreter onwards) run another way below
+            results = self._run_suite(cases)
+            if len(results) < len(cases):
+                results += self._run_in_parallel(cases[len(results):])
+            return results
+        
+        return self._run_in_parallel(cases)
+    
+    def _run_in_parallel(self, cases: List[Tuple[str, str, str, bytes]]) -> List[TestResult]:
+        """
+        Run (test_name, input_data, expected_output, expected_bytes) cases in
+        concurrent subprocesses, one test case or batch per subprocess.
+        
+        Returns:
+            List of test results, in the same order as cases
+        """
+        # asyncio.run() cannot start a loop inside one that is running
+        if self.use_asyncio and self.batch_size == 1 and not _event_loop_running():
+            return asyncio.run(self._run_all_async(cases))
+        
+        # Each test case (or batch) runs in its own subprocess, so threads are
+        # enough to keep every core busy; executor.map yields results in
+        # input order.
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            if self.batch_size == 1:
+                return list(executor.map(
+                    lambda case: self._execute_test_case(case[1], case[2], case[0], case[3]),
+                    cases
+                ))
+            
+            results = []
+            fd, driver_file = tempfile.mkstemp(suffix='.py')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    f.write(_BATCH_DRIVER)
+                batches = [cases[i:i + self.batch_size]
+                           for i in range(0, len(cases), self.batch_size)]
+                for batch_results in executor.map(
+                        lambda batch: self._run_batch(driver_file, batch), batches):
+                    results.extend(batch_results)
+            finally:
+                os.remove(driver_file)
+        return results
+    
     def print_summary(self):
         """Print a summary of all test results."""
         if not self.results:
@@ -112,30 +1167,34 @@ class TestCaseGrader:
             return
         
         total = len(self.results)
-        passed = sum(1 for r in self.results if r['passed'])
+        passed = self._passed_count()
         failed = total - passed
         
-        print("\n" + "="*60)
-        print(f"TEST SUMMARY: {passed}/{total} tests passed")
-        print("="*60)
+        # Build the whole report and write it once, rather than paying for a
+        # print() call per line
+        parts = []
+        parts.append("\n" + "="*60 + "\n")
+        parts.append(f"TEST SUMMARY: {passed}/{total} tests passed\n")
+        parts.append("="*60 + "\n")
         
         for result in self.results:
-            status = "✓ PASS" if result['passed'] else "✗ FAIL"
-            print(f"\n{status}: {result['test_name']}")
+            status = "✓ PASS" if result.passed else "✗ FAIL"
+            parts.append(f"\n{status}: {result.test_name}\n")
             
-            if not result['passed']:
-                print(f"  Input: {repr(result['input'])}")
-                print(f"  Expected: {repr(result['expected_output'])}")
-                print(f"  Got: {repr(result['actual_output'])}")
+            if not result.passed:
+                parts.append(f"  Input: {_preview(result.input)}\n")
+                parts.append(f"  Expected: {_preview(result.expected_output)}\n")
+                parts.append(f"  Got: {_preview(result.actual_output)}\n")
                 
-                if result.get('error'):
-                    print(f"  Error: {result['error']}")
-                if result.get('stderr'):
-                    print(f"  Stderr: {result['stderr']}")
+                if result.error:
+                    parts.append(f"  Error: {result.error}\n")
+                if result.stderr:
+                    parts.append(f"  Stderr: {result.stderr}\n")
         
-        print("\n" + "="*60)
-        print(f"Score: {passed}/{total} ({100*passed/total:.1f}%)")
-        print("="*60 + "\n")
+        parts.append("\n" + "="*60 + "\n")
+        parts.append(f"Score: {passed}/{total} ({100*passed/total:.1f}%)\n")
+        parts.append("="*60 + "\n\n")
+        sys.stdout.write(''.join(parts))
     
     def get_score(self) -> Tuple[int, int]:
         """
@@ -146,8 +1205,13 @@ class TestCaseGrader:
         """
         if not self.results:
             return (0, 0)
-        passed = sum(1 for r in self.results if r['passed'])
-        return (passed, len(self.results))
+        return (self._passed_count(), len(self.results))
+    
+    def _passed_count(self) -> int:
+        """Count passed results, resyncing the flags if self.results was replaced."""
+        if len(self._passed) != len(self.results):
+            self._passed = array.array('b', (r.passed for r in self.results))
+        return self._passed.count(1)
     
     def load_tests_from_directory(self, test_dir: str, 
                                    input_pattern: str = "*.in",
@@ -176,13 +1240,28 @@ class TestCaseGrader:
         if not test_dir_path.exists():
             raise FileNotFoundError(f"Test directory not found: {test_dir}")
         
+        # Scan the directory once and match both patterns against the names,
+        # compiling each pattern a single time
+        with os.scandir(test_dir_path) as it:
+            file_names = sorted(entry.name for entry in it if entry.is_file())
+        is_input = re.compile(fnmatch.translate(input_pattern)).match
+        is_output = re.compile(fnmatch.translate(output_pattern)).match
+        
         # Find all input files
-        input_files = sorted(test_dir_path.glob(input_pattern))
+        input_files = [test_dir_path / name for name in file_names if is_input(name)]
         
         if not input_files:
             raise ValueError(f"No input files found matching pattern '{input_pattern}' in {test_dir}")
         
-        test_cases = []
+        # Index the output files by base name, so matching each input below
+        # is a lookup rather than another directory search
+        outputs_by_stem = {}
+        for name in file_names:
+            if is_output(name):
+                outputs_by_stem.setdefault(Path(name).stem, test_dir_path / name)
+        file_names = set(file_names)
+        
+        pairs = []
         
         for input_file in input_files:
             # Determine the corresponding output file
@@ -199,44 +1278,53 @@ class TestCaseGrader:
             
             if ext_output:  # If output pattern has an extension
                 potential_output = input_file.with_suffix(ext_output)
-                if potential_output.exists():
+                if potential_output.name in file_names:
                     output_file = potential_output
             
             # Method 2: Look for files with same base name
             if not output_file:
-                output_files = list(test_dir_path.glob(output_pattern))
-                for out_file in output_files:
-                    if out_file.stem == base_name:
-                        output_file = out_file
-                        break
+                output_file = outputs_by_stem.get(base_name)
             
-            if not output_file or not output_file.exists():
+            if not output_file:
                 print(f"Warning: No matching output file found for {input_file.name}, skipping...")
                 continue
             
-            # Read input and output
-            try:
-                with open(input_file, 'r') as f:
-                    input_data = f.read()
-                
-                with open(output_file, 'r') as f:
-                    expected_output = f.read()
+            pairs.append((base_name, input_file, output_file))
+        
+        def read_pair(pair):
+            _, input_file, output_file = pair
+            with open(input_file, 'r') as f:
+                input_data = f.read()
+            
+            with open(output_file, 'r') as f:
+                expected_output = f.read()
+            
+            return input_data, expected_output
+        
+        # Read input and output files concurrently so a cold cache costs
+        # roughly one round of disk latency instead of one per file
+        test_cases = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(read_pair, pair) for pair in pairs]
+            for (base_name, input_file, output_file), future in zip(pairs, futures):
+                try:
+                    input_data, expected_output = future.result()
+                except Exception as e:
+                    print(f"Error reading test files {input_file.name}/{output_file.name}: {e}")
+                    continue
                 
                 test_cases.append({
                     'name': base_name,
                     'input': input_data,
-                    'expected_output': expected_output
+                    'expected_output': expected_output,
+                    'expected_bytes': expected_output.strip().encode('utf-8')
                 })
-                
-            except Exception as e:
-                print(f"Error reading test files {input_file.name}/{output_file.name}: {e}")
-                continue
         
         return test_cases
     
     def run_tests_from_directory(self, test_dir: str,
                                   input_pattern: str = "*.in",
-                                  output_pattern: str = "*.out") -> List[Dict[str, Any]]:
+                                  output_pattern: str = "*.out") -> List[TestResult]:
         """
         Load and run all test cases from a directory.
         